@@ -0,0 +1,111 @@
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+from buffer_pool import thread_pool
+from flight_recorder import load_dump
+from frame_preprocessor import FramePreprocessor
+from simulator import SCENARIOS, GameSimulator
+from template_locator import TEMPLATE_CACHE_BYTES, cache_stats, configure_cache, locate
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Track allocations and peak RSS of the locate loop.")
+    parser.add_argument("--replay", help="flight recorder dump to replay, defaults to simulated frames")
+    parser.add_argument("--duration", type=float, default=600.0, help="seconds to run")
+    parser.add_argument("--cache-mb", type=int, default=TEMPLATE_CACHE_BYTES // (1024 * 1024),
+                        help="memory budget of the template feature cache in MiB")
+    parser.add_argument("--half-precision", action="store_true", help="store SIFT descriptors as float16")
+    parser.add_argument("--preprocessed", action="store_true",
+                        help="feed cropped grayscale frames as WindowCapture does, instead of raw BGRA frames")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    configure_cache(args.cache_mb * 1024 * 1024, args.half_precision)
+
+    random.seed(args.seed)
+    np.random.seed(args.seed)
+
+    frames = _replayed_frames(Path(args.replay)) if args.replay else _simulated_frames(args.preprocessed)
+    templates = sorted({screen.template for screens in SCENARIOS.values() for screen in screens})
+
+    # Count garbage collections, which cause the pauses allocations lead to
+    collections = [0, 0, 0]
+
+    def count_collection(phase: str, info: dict) -> None:
+        if phase == "start":
+            collections[info["generation"]] += 1
+
+    gc.callbacks.append(count_collection)
+
+    # Warm up caches and scratch buffers before measuring
+    for frame in frames:
+        locate(frame, templates)
+
+    tracemalloc.start()
+    # Ignore the bookkeeping of tracemalloc and of this script
+    ignored = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+    baseline = tracemalloc.take_snapshot().filter_traces(ignored)
+    calls, peaks = 0, []
+    start = time.perf_counter()
+    while time.perf_counter() - start < args.duration:
+        frame = frames[calls % len(frames)]
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        locate(frame, templates)
+        # Memory allocated on top of what was live before the call, freed or not
+        peaks.append(tracemalloc.get_traced_memory()[1] - before)
+        calls += 1
+    elapsed = time.perf_counter() - start
+    # Blocks allocated during the run and still alive, e.g. caches growing or leaks
+    retained = tracemalloc.take_snapshot().filter_traces(ignored).compare_to(baseline, "lineno")
+    tracemalloc.stop()
+
+    print(f"duration:         {elapsed:.1f}s")
+    print(f"locate calls:     {calls} ({calls / elapsed:.1f}/s)")
+    print(f"frames:           {frames[0].shape[1]}x{frames[0].shape[0]}, {'BGRA' if frames[0].ndim == 3 else 'gray'}")
+    print(f"transient/call:   mean {np.mean(peaks) / 1024 / 1024:.2f} MiB, max {np.max(peaks) / 1024 / 1024:.2f} MiB")
+    # Each call's transient peak is allocated at least once, so this is a lower bound
+    print(f"allocated:        ~{np.mean(peaks) * calls / elapsed / 1024 / 1024:.1f} MiB/s "
+          f"(estimate: mean transient/call x calls/s)")
+    print(f"retained:         {sum(d.size_diff for d in retained) / 1024:+.1f} KiB "
+          f"in {sum(d.count_diff for d in retained):+d} blocks")
+    for diff in sorted(retained, key=lambda d: abs(d.size_diff), reverse=True)[:5]:
+        if diff.size_diff:
+            print(f"  {diff.size_diff / 1024:+8.1f} KiB {diff.count_diff:+6d} blocks  {diff.traceback[0]}")
+    print(f"pool allocations: {thread_pool().allocations}")
+    stats = cache_stats()
+    print(f"template cache:   {stats.hits} hits, {stats.misses} misses, {stats.evictions} evictions, "
+          f"{stats.bytes / 1024 / 1024:.1f} MiB")
+    print(f"gc collections:   gen0={collections[0]} gen1={collections[1]} gen2={collections[2]}")
+    if resource:
+        # ru_maxrss is reported in KiB on Linux
+        print(f"peak rss:         {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.1f} MiB")
+
+
+def _simulated_frames(preprocessed: bool) -> list[np.ndarray]:
+    """Render one raw BGRA frame, or its preprocessed grayscale crop, for every screen of every scenario."""
+    frames = [GameSimulator([screen]).render() for screens in SCENARIOS.values() for screen in screens]
+    if preprocessed:
+        preprocessor = FramePreprocessor()
+        frames = [preprocessor.process(frame)[0] for frame in frames]
+    return frames
+
+
+def _replayed_frames(directory: Path) -> list[np.ndarray]:
+    """Load the recorded frames of a flight recorder dump."""
+    frames, _ = load_dump(directory)
+    return [image for _, _, image, _ in frames]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+import argparse
+import random
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from config import FeatureBackend
+from simulator import FRAME_HEIGHT, FRAME_WIDTH, GameSimulator, Screen
+import template_locator
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare feature backends over all templates.")
+    parser.add_argument("--frames", help="directory of recorded frames, laid out like templates/ "
+                                         "(e.g. frames/combat/compass/*.png)")
+    parser.add_argument("--samples", type=int, default=10, help="synthetic frames per template")
+    parser.add_argument("--backends", nargs="+", default=[b.value for b in FeatureBackend],
+                        choices=[b.value for b in FeatureBackend])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    np.random.seed(args.seed)
+
+    templates = template_names()
+    if args.frames:
+        frames = {t: recorded_frames(Path(args.frames), t) for t in templates}
+    else:
+        frames = {t: synthetic_frames(t, args.samples) for t in templates}
+
+    print(f"{'template':32} {'backend':8} {'found':>7} {'hits':>7} {'false+':>7} {'kp':>6} {'ms':>8}")
+    for template in templates:
+        # Frames of other templates serve as negatives
+        negatives = [f for t, fs in frames.items() if Path(t).name != Path(template).name for f in fs]
+        negatives = random.sample(negatives, min(len(negatives), len(frames[template])))
+        for backend in map(FeatureBackend, args.backends):
+            print(evaluate(template, backend, frames[template], negatives))
+
+
+def evaluate(template: str, backend: FeatureBackend, positives: list, negatives: list,
+        label: str | None = None) -> str:
+    """Run locate over positive and negative frames and format one result row."""
+    _, kp, _ = template_locator.load_template_features(template, backend)
+    found = hits = false_positives = 0
+    latencies = []
+
+    for frame, target in positives:
+        start = time.perf_counter()
+        pos = template_locator.locate(frame, template, backend=backend)
+        latencies.append(time.perf_counter() - start)
+        if pos is not None:
+            found += 1
+            hits += target is None or inside(pos, target)
+
+    for frame, _ in negatives:
+        start = time.perf_counter()
+        pos = template_locator.locate(frame, template, backend=backend)
+        latencies.append(time.perf_counter() - start)
+        false_positives += pos is not None
+
+    return (
+        f"{template:32} {label or backend.value:8} "
+        f"{found:>3}/{len(positives):<3} {hits:>3}/{len(positives):<3} "
+        f"{false_positives:>3}/{len(negatives):<3} {len(kp):>6} {np.mean(latencies) * 1000:>8.1f}"
+    )
+
+
+def template_names() -> list[str]:
+    """Return the paths of all templates relative to the template root."""
+    root = template_locator.TEMPLATE_ROOT
+    return sorted(p.relative_to(root).as_posix() for p in root.rglob("*.png"))
+
+
+def synthetic_frames(template: str, count: int) -> list[tuple[np.ndarray, tuple | None]]:
+    """Render frames showing the template at random positions using the game simulator."""
+    frames = []
+    for _ in range(count):
+        position = (random.randint(100, FRAME_WIDTH - 100), random.randint(100, FRAME_HEIGHT - 100))
+        simulator = GameSimulator([Screen(template, position)])
+        frames.append((simulator.render(), simulator.target))
+    return frames
+
+
+def recorded_frames(root: Path, template: str) -> list[tuple[np.ndarray, tuple | None]]:
+    """Load recorded frames of the template; positions are unknown so only detection is scored."""
+    frames = []
+    for path in sorted((root / Path(template).with_suffix("")).glob("*.png")):
+        frame = cv2.imread(str(path), cv2.IMREAD_COLOR)
+        if frame is not None:
+            frames.append((cv2.cvtColor(frame, cv2.COLOR_BGR2BGRA), None))
+    return frames
+
+
+def inside(position: tuple, rect: tuple) -> bool:
+    """Check whether the position lies inside the rect (x, y, w, h)."""
+    x, y, w, h = rect
+    return x <= position[0] < x + w and y <= position[1] < y + h
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+import threading
+
+import numpy as np
+
+
+class BufferPool:
+    """Named scratch arrays that are reused between calls and only reallocated when their shape changes."""
+
+    def __init__(self) -> None:
+        self._buffers: dict[str, np.ndarray] = {}
+        self.allocations = 0
+
+    def get(self, name: str, shape: tuple[int, ...], dtype=np.uint8) -> np.ndarray:
+        """Return the buffer with the given name, reallocating it if shape or dtype differ."""
+        buffer = self._buffers.get(name)
+        if buffer is None or buffer.shape != shape or buffer.dtype != dtype:
+            buffer = np.empty(shape, dtype)
+            self._buffers[name] = buffer
+            self.allocations += 1
+        return buffer
+
+
+# One pool per thread, so concurrent detectors never share scratch buffers
+_local = threading.local()
+
+
+def thread_pool() -> BufferPool:
+    """Return the buffer pool of the calling thread."""
+    if not hasattr(_local, "pool"):
+        _local.pool = BufferPool()
+    return _local.pool
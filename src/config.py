@@ -7,6 +7,13 @@ class CaptureMode(Enum):
     CONTINUOUS = "Continuous Capture"
 
 
+class FeatureBackend(Enum):
+    """Keypoint detector and descriptor used by the template locator."""
+    SIFT = "sift"
+    ORB = "orb"
+    AKAZE = "akaze"
+
+
 class TriState(Enum):
     """Tri-state toggle: enabled / disabled / unset."""
     ENABLED = "enabled"
@@ -21,6 +28,8 @@ class Settings:
     _capture_mode: CaptureMode = CaptureMode.SINGLE
     _advance: TriState = TriState.UNSET
     _night_battle: TriState = TriState.UNSET
+    _feature_backend: FeatureBackend = FeatureBackend.SIFT
+    _record: bool = False
 
     # Capture mode property
     @property
@@ -69,6 +78,36 @@ class Settings:
             raise ValueError("night_battle must be a TriState")
         self._night_battle = value
 
+    # Feature backend property
+    @property
+    def feature_backend(self) -> FeatureBackend:
+        """Get default feature backend for template matching."""
+        return self._feature_backend
+
+    @feature_backend.setter
+    def feature_backend(self, value: FeatureBackend):
+        """Set default feature backend, must be a FeatureBackend enum."""
+        if not isinstance(value, FeatureBackend):
+            raise ValueError("feature_backend must be a FeatureBackend")
+        self._feature_backend = value
+
+    # Flight recorder property
+    @property
+    def record(self) -> bool:
+        """Get whether strategies keep a flight recorder."""
+        return self._record
+
+    @record.setter
+    def record(self, value: bool):
+        """Set whether strategies keep a flight recorder, must be a bool."""
+        if not isinstance(value, bool):
+            raise ValueError("record must be a bool")
+        self._record = value
+
+    def toggle_record(self):
+        """Toggle the flight recorder on or off."""
+        self.record = not self.record
+
 
 # Global settings instance
 settings = Settings()
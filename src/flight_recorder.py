@@ -0,0 +1,141 @@
+import json
+import queue
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from frame_preprocessor import CropTransform
+
+# Default directory for recorder dumps
+DUMP_ROOT = Path.cwd() / "recordings"
+
+# JPEG quality of recorded frames
+FRAME_QUALITY = 90
+
+# Raw frames waiting for compression; frames arriving while the queue is full are dropped
+PENDING_FRAMES = 2
+
+
+@dataclass
+class Decision:
+    """A single template search and its outcome; position is in the coordinates of the recorded frame."""
+    timestamp: float
+    frame_id: int
+    templates: list[str]
+    template: str | None = None
+    score: float | None = None
+    position: tuple[int, int] | None = None
+
+
+class FlightRecorder:
+    """
+    Keep the most recent frames and decisions in a bounded ring buffer.
+    Frames are JPEG-compressed in a background thread so recording stays off the hot path.
+    """
+
+    def __init__(self, seconds: float = 60.0, max_bytes: int = 64 * 1024 * 1024) -> None:
+        """Initialize the recorder with a time window and a hard cap on compressed frame bytes."""
+        self.seconds = seconds
+        self.max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        self._frames: deque[tuple[int, float, bytes, CropTransform]] = deque()
+        self._decisions: deque[Decision] = deque()
+        self._bytes = 0
+        self._frame_id = 0
+        self._pending: queue.Queue[tuple[int, float, np.ndarray, CropTransform] | None] = queue.Queue(PENDING_FRAMES)
+        self._worker: threading.Thread | None = None
+
+    def start(self) -> None:
+        """Start the background compression thread."""
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._compress_frames, daemon=True)
+            self._worker.start()
+
+    def stop(self) -> None:
+        """Stop the background compression thread."""
+        if self._worker is not None:
+            self._pending.put(None)
+            self._worker.join()
+            self._worker = None
+
+    def record_frame(self, frame: np.ndarray, transform: CropTransform = CropTransform()) -> int:
+        """
+        Queue a frame for compression and return its id; the frame must not be modified afterwards.
+        The transform maps positions in the frame back to window client coordinates.
+        """
+        self._frame_id += 1
+        try:
+            self._pending.put_nowait((self._frame_id, time.time(), frame, transform))
+        except queue.Full:
+            pass
+        return self._frame_id
+
+    def record_decision(self, decision: Decision) -> None:
+        """Append a decision to the ring buffer."""
+        with self._lock:
+            self._decisions.append(decision)
+            self._evict(decision.timestamp)
+
+    def dump(self, directory: Path | None = None) -> Path:
+        """Write the buffered frames and decisions to disk and return the dump directory."""
+        with self._lock:
+            frames = list(self._frames)
+            decisions = list(self._decisions)
+
+        directory = directory or DUMP_ROOT / time.strftime("%Y%m%d-%H%M%S")
+        directory.mkdir(parents=True, exist_ok=True)
+
+        with open(directory / "log.jsonl", "w", encoding="utf-8") as log:
+            for frame_id, timestamp, data, transform in frames:
+                name = f"frame_{frame_id:06d}.jpg"
+                (directory / name).write_bytes(data)
+                log.write(json.dumps({
+                    "type": "frame", "id": frame_id, "timestamp": timestamp, "file": name,
+                    "transform": [transform.x, transform.y, transform.scale],
+                }) + "\n")
+            for decision in decisions:
+                log.write(json.dumps({"type": "decision", **decision.__dict__}) + "\n")
+        return directory
+
+    def _compress_frames(self) -> None:
+        """Compress queued frames and store them in the ring buffer."""
+        while (item := self._pending.get()) is not None:
+            frame_id, timestamp, frame, transform = item
+            ok, data = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, FRAME_QUALITY])
+            if not ok:
+                continue
+            with self._lock:
+                self._frames.append((frame_id, timestamp, data.tobytes(), transform))
+                self._bytes += len(data)
+                self._evict(timestamp)
+
+    def _evict(self, now: float) -> None:
+        """Drop entries older than the time window and frames over the byte budget."""
+        while self._frames and (self._bytes > self.max_bytes or self._frames[0][1] < now - self.seconds):
+            self._bytes -= len(self._frames.popleft()[2])
+        while self._decisions and self._decisions[0].timestamp < now - self.seconds:
+            self._decisions.popleft()
+
+
+def load_dump(directory: Path) -> tuple[list[tuple[int, float, np.ndarray, CropTransform]], list[Decision]]:
+    """
+    Load a dump written by FlightRecorder.dump as (frames, decisions) for replay.
+    Each frame comes with the transform mapping its positions back to window client coordinates.
+    """
+    frames, decisions = [], []
+    with open(directory / "log.jsonl", encoding="utf-8") as log:
+        for line in log:
+            record = json.loads(line)
+            if record.pop("type") == "frame":
+                image = cv2.imread(str(directory / record["file"]), cv2.IMREAD_UNCHANGED)
+                frames.append((record["id"], record["timestamp"], image, CropTransform(*record["transform"])))
+            else:
+                position = record.pop("position")
+                decisions.append(Decision(**record, position=tuple(position) if position else None))
+    return frames, decisions
@@ -0,0 +1,129 @@
+import time
+from collections import deque
+from dataclasses import dataclass
+from functools import reduce
+
+import cv2
+import numpy as np
+
+# KanColle renders at 1200x720; poi shows the canvas scaled by its zoom level and the Windows DPI scale
+CANVAS_SIZE = (1200, 720)
+CANVAS_SCALES = sorted({zoom * dpi for zoom in (0.5, 0.75, 1.0, 1.25, 1.5, 2.0) for dpi in (1.0, 1.25, 1.5, 1.75, 2.0)})
+
+# Share of detailed pixels a canvas must have; also trades canvas size against flat area when choosing a scale
+MIN_CANVAS_DETAIL = 0.5
+
+# Detections that must agree, in a row, before a canvas is accepted; their detail is accumulated,
+# so parts of the canvas that are flat in one frame (e.g. during transitions) show up in another
+CONFIRM_DETECTIONS = 3
+
+# Seconds between detections while no canvas is accepted or a new one awaits confirmation, spanning
+# longer than a screen transition, and between re-checks of an accepted canvas
+REDETECT_INTERVAL = 1.0
+RECHECK_INTERVAL = 10.0
+
+# Gray level difference within a 3x3 neighbourhood that counts as detail
+DETAIL_THRESHOLD = 2
+
+
+@dataclass(frozen=True)
+class CropTransform:
+    """Maps positions in a processed frame back to window client coordinates."""
+    x: int = 0
+    y: int = 0
+    scale: float = 1.0
+
+    def to_client(self, position: tuple) -> tuple[int, int]:
+        """Map a position in the processed frame back to window client coordinates."""
+        return (int(position[0] / self.scale) + self.x, int(position[1] / self.scale) + self.y)
+
+
+class FramePreprocessor:
+    """
+    Crop captured window frames to the game canvas and convert them to grayscale.
+    The canvas is detected periodically and only changes once several detections agree.
+    Each processed frame comes with the transform needed to map positions back to window client coordinates.
+    """
+
+    def __init__(self, scale: float = 1.0) -> None:
+        """Initialize with an optional downsampling factor (1.0 keeps full resolution)."""
+        self.scale = scale
+        self._frame_size: tuple[int, int] | None = None
+        self._canvas: tuple[int, int, int, int] | None = None
+        # Latest detection and how many detections in a row produced it
+        self._candidate: tuple[int, int, int, int] | None = None
+        self._confirmations = 0
+        self._details: deque[np.ndarray] = deque(maxlen=CONFIRM_DETECTIONS)
+        self._next_detection = 0.0
+
+    @property
+    def canvas(self) -> (tuple[int, int, int, int] | None):
+        """Accepted game canvas (x, y, w, h) in window client coordinates, None while falling back."""
+        return self._canvas
+
+    @property
+    def fallback(self) -> bool:
+        """Whether no canvas is accepted and whole frames are used."""
+        return self._canvas is None
+
+    def process(self, frame: np.ndarray) -> tuple[np.ndarray, CropTransform]:
+        """Crop the BGRA frame to the game canvas, convert to grayscale and downsample."""
+        # Start over when the window is resized
+        if frame.shape[:2] != self._frame_size:
+            self._frame_size = frame.shape[:2]
+            self._canvas = self._candidate = None
+            self._details.clear()
+            self._next_detection = 0.0
+        if time.monotonic() >= self._next_detection:
+            self._update_canvas(frame)
+
+        # Fall back to the whole frame
+        x, y, w, h = self._canvas or (0, 0, frame.shape[1], frame.shape[0])
+        gray = cv2.cvtColor(frame[y:y + h, x:x + w], cv2.COLOR_BGRA2GRAY)
+        if self.scale != 1.0:
+            gray = cv2.resize(gray, None, fx=self.scale, fy=self.scale, interpolation=cv2.INTER_AREA)
+        return gray, CropTransform(x, y, self.scale)
+
+    def _update_canvas(self, frame: np.ndarray) -> None:
+        """Detect the canvas and accept it once CONFIRM_DETECTIONS detections in a row agree."""
+        self._details.append(_detail_mask(frame))
+        detected = _detect_canvas(reduce(np.bitwise_or, self._details))
+        if detected is not None and detected == self._candidate:
+            self._confirmations += 1
+        else:
+            self._candidate = detected
+            self._confirmations = 1
+        # A failed re-check (e.g. a black loading screen) keeps the accepted canvas
+        if detected is not None and self._confirmations >= CONFIRM_DETECTIONS:
+            self._canvas = detected
+
+        settled = self._canvas is not None and self._candidate in (None, self._canvas)
+        self._next_detection = time.monotonic() + (RECHECK_INTERVAL if settled else REDETECT_INTERVAL)
+
+
+def _detail_mask(frame: np.ndarray) -> np.ndarray:
+    """Mark pixels that differ from their neighbours; poi's panels are flat or sparse text."""
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGRA2GRAY)
+    detail = (cv2.morphologyEx(gray, cv2.MORPH_GRADIENT, None) > DETAIL_THRESHOLD).astype(np.uint8)
+    # The 3x3 gradient spreads one pixel past the canvas border
+    return cv2.erode(detail, None)
+
+
+def _detect_canvas(detail: np.ndarray) -> (tuple[int, int, int, int] | None):
+    """
+    Find the rect of a known canvas size holding the most detail, counting flat pixels against it.
+    Return None if no rect is detailed enough.
+    """
+    integral = cv2.integral(detail)
+    best, best_score = None, 0.0
+    for scale in CANVAS_SCALES:
+        w, h = round(CANVAS_SIZE[0] * scale), round(CANVAS_SIZE[1] * scale)
+        if w > detail.shape[1] or h > detail.shape[0]:
+            continue
+        # Detailed pixels in every w x h window
+        counts = integral[h:, w:] - integral[:-h, w:] - integral[h:, :-w] + integral[:-h, :-w]
+        y, x = np.unravel_index(np.argmax(counts), counts.shape)
+        score = counts[y, x] - MIN_CANVAS_DETAIL * w * h
+        if score > best_score:
+            best, best_score = (int(x), int(y), w, h), score
+    return best
@@ -0,0 +1,151 @@
+import argparse
+import asyncio
+import json
+import sys
+import threading
+import time
+
+import config
+from background_mouse import BackgroundMouse
+from flight_recorder import FlightRecorder
+from sortie_strategy import FORMATIONS, MAPS, SortieStrategy
+from strategy import Strategy
+import template_locator
+from window_capture import WindowCapture
+
+# Default settings, overridden by the config file and then by command-line flags
+DEFAULTS = {
+    "window": "poi",
+    "strategy": "combat",
+    "capture_mode": "single",
+    "advance": "unset",
+    "night_battle": "unset",
+    "formation": "x",
+    "sorties": 0,
+    "record": False,
+    "cache_mb": template_locator.TEMPLATE_CACHE_BYTES // (1024 * 1024),
+    "half_precision": template_locator.TEMPLATE_CACHE_HALF_PRECISION,
+}
+
+# Allowed values of the choice settings, shared by the flags and config file validation
+CHOICES = {
+    "strategy": ("combat",) + MAPS,
+    "capture_mode": tuple(m.name.lower() for m in config.CaptureMode),
+    "advance": tuple(s.value for s in config.TriState),
+    "night_battle": tuple(s.value for s in config.TriState),
+    "formation": FORMATIONS,
+}
+
+
+def parse_settings() -> dict:
+    """Merge defaults, the optional JSON config file and command-line flags."""
+    parser = argparse.ArgumentParser(description="Run a strategy without the Flet UI.")
+    parser.add_argument("--config", help="JSON file with any of the settings below")
+    parser.add_argument("--window", help="title of the game window")
+    parser.add_argument("--strategy", choices=CHOICES["strategy"])
+    parser.add_argument("--capture-mode", choices=CHOICES["capture_mode"])
+    parser.add_argument("--advance", choices=CHOICES["advance"])
+    parser.add_argument("--night-battle", choices=CHOICES["night_battle"])
+    parser.add_argument("--formation", choices=CHOICES["formation"], help="formation for 5-2")
+    parser.add_argument("--sorties", type=int, help="sorties to run for 5-2/5-3, 0 repeats until stopped")
+    parser.add_argument("--record", action="store_true", default=None,
+                        help="keep a flight recorder; press Enter to save it, it is also saved on exit")
+    parser.add_argument("--cache-mb", type=int, help="memory budget of the template feature cache in MiB")
+    parser.add_argument("--half-precision", action="store_true", default=None,
+                        help="store SIFT descriptors as float16 in the template cache")
+    args = parser.parse_args()
+
+    settings = dict(DEFAULTS)
+    if args.config:
+        try:
+            with open(args.config, encoding="utf-8") as f:
+                file_settings = json.load(f)
+        except (OSError, ValueError) as e:
+            parser.error(f"cannot read config file {args.config}: {e}")
+        if not isinstance(file_settings, dict):
+            parser.error(f"config file {args.config} must contain a JSON object")
+        settings.update(file_settings)
+    settings.update({k: v for k, v in vars(args).items() if k != "config" and v is not None})
+
+    error = validate_settings(settings)
+    if error:
+        parser.error(error)
+    return settings
+
+
+def validate_settings(settings: dict) -> (str | None):
+    """Check merged settings against the same rules as the flags and return the first error, if any."""
+    for key in settings:
+        if key not in DEFAULTS:
+            return f"unknown setting '{key}'"
+    for key, choices in CHOICES.items():
+        if settings[key] not in choices:
+            return f"{key} must be one of {', '.join(choices)}, got {settings[key]!r}"
+    if not isinstance(settings["window"], str) or not settings["window"]:
+        return f"window must be a non-empty string, got {settings['window']!r}"
+    # bool is a subclass of int, so reject it explicitly
+    if type(settings["sorties"]) is not int or settings["sorties"] < 0:
+        return f"sorties must be an integer >= 0, got {settings['sorties']!r}"
+    if type(settings["cache_mb"]) is not int or settings["cache_mb"] <= 0:
+        return f"cache_mb must be an integer > 0, got {settings['cache_mb']!r}"
+    for key in ("record", "half_precision"):
+        if not isinstance(settings[key], bool):
+            return f"{key} must be true or false, got {settings[key]!r}"
+    return None
+
+
+def log(message: str) -> None:
+    """Print a timestamped progress message."""
+    print(f"[{time.strftime('%H:%M:%S')}] {message}", flush=True)
+
+
+async def run(settings: dict) -> None:
+    """Create the backends and run the selected strategy until it finishes or is interrupted."""
+    config.settings.capture_mode = config.CaptureMode[settings["capture_mode"].upper()]
+    config.settings.advance = config.TriState(settings["advance"])
+    config.settings.night_battle = config.TriState(settings["night_battle"])
+    template_locator.configure_cache(settings["cache_mb"] * 1024 * 1024, settings["half_precision"])
+
+    wc = WindowCapture(settings["window"])
+    bg_mouse = BackgroundMouse(settings["window"])
+    recorder = FlightRecorder() if settings["record"] else None
+    if settings["strategy"] == "combat":
+        strategy = Strategy(wc, bg_mouse, recorder)
+    else:
+        strategy = SortieStrategy(wc, bg_mouse, settings["strategy"], settings["formation"], settings["sorties"],
+                                  recorder)
+    strategy.on_status = log
+
+    log(f"running {settings['strategy']} on window '{settings['window']}'")
+    strategy.run()
+    if recorder:
+        # Daemon thread so a pending read does not keep the process alive
+        threading.Thread(target=dump_on_enter, args=(strategy,), daemon=True).start()
+    try:
+        await strategy.task
+    finally:
+        strategy.stop()
+        if recorder:
+            log(f"recording saved to {strategy.dump_recording()}")
+        stats = template_locator.cache_stats()
+        log(f"template cache: {stats.hits} hits, {stats.misses} misses, {stats.evictions} evictions, "
+            f"{stats.entries} entries, {stats.bytes / 1024 / 1024:.1f} MiB")
+        log("stopped")
+
+
+def dump_on_enter(strategy: Strategy) -> None:
+    """Save the flight recorder's buffer every time Enter is pressed, e.g. when the strategy stalls."""
+    log("recording, press Enter to save the last frames")
+    while sys.stdin.readline():
+        log(f"recording saved to {strategy.dump_recording()}")
+
+
+def main():
+    try:
+        asyncio.run(run(parse_settings()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
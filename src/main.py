@@ -1,4 +1,6 @@
+import config
 from background_mouse import BackgroundMouse
+from flight_recorder import FlightRecorder
 from strategy import Strategy
 from ui import UI
 from window_capture import WindowCapture
@@ -11,14 +13,18 @@ def main():
         nonlocal strategy
         wc = WindowCapture(title)
         bg_mouse = BackgroundMouse(title)
-        strategy = Strategy(wc, bg_mouse)
+        recorder = FlightRecorder() if config.settings.record else None
+        strategy = Strategy(wc, bg_mouse, recorder)
         strategy.run()
 
     def stop_strategy():
         if strategy:
             strategy.stop()
 
-    UI().run(run_strategy, stop_strategy)
+    def dump_recording():
+        return strategy.dump_recording() if strategy else None
+
+    UI().run(run_strategy, stop_strategy, dump_recording)
 
 
 if __name__ == "__main__":
@@ -1,8 +1,8 @@
-import asyncio
 import flet as ft
+import config
 from background_mouse import BackgroundMouse
-from strategy import Strategy
-from template_locator import locate
+from flight_recorder import FlightRecorder
+from sortie_strategy import SortieStrategy
 from ui import UI
 from window_capture import WindowCapture
 
@@ -11,8 +11,8 @@ from window_capture import WindowCapture
 wc = WindowCapture("poi")
 bg_mouse = BackgroundMouse("poi")
 strategies = {
-    "5-2": Strategy(wc, bg_mouse),
-    "5-3": Strategy(wc, bg_mouse)
+    "5-2": SortieStrategy(wc, bg_mouse, "5-2"),
+    "5-3": SortieStrategy(wc, bg_mouse, "5-3")
 }
 
 # ui
@@ -43,94 +43,32 @@ formation_options = ft.SegmentedButton(
 
 
 def override_strategy():
-    async def _run_5_2():
-        try:
-            await wait_and_click("port/sortie.png", double_click=True)
-            await wait_and_click("sortie/sortie.png", double_click=True)
-            await wait_and_click("sortie/world_5.png")
-            await wait_and_click("sortie/5-2.png")
-            await wait_and_click("sortie/confirm_1.png")
-            await wait_and_click("sortie/confirm_2.png")
-            await wait_and_click("combat/compass.png")
-            if formation_options.selected[0] != "x":
-                await wait_and_click(f"combat/{formation_options.selected[0]}.png")
-            await wait_and_click("common/next.png", wait=3.0)
-            await wait_and_click("common/next.png")
-            await wait_and_click("combat/retreat.png")
-            start_button.on_click()
-        except asyncio.CancelledError:
-            return
-
-    async def _run_5_3():
-        try:
-            await wait_and_click("port/sortie.png", double_click=True)
-            await wait_and_click("sortie/sortie.png", double_click=True)
-            await wait_and_click("sortie/world_5.png")
-            await wait_and_click("sortie/5-3.png")
-            await wait_and_click("sortie/confirm_1.png")
-            await wait_and_click("sortie/confirm_2.png")
-
-            await wait_and_click("combat/compass.png", wait=5.0)
-            await wait_and_click("combat/compass.png")
-            await wait_and_click("combat/line_ahead.png")
-            await wait_and_click("common/next.png", wait=3.0)
-            await wait_and_click("common/next.png")
-            await wait_and_click("combat/advance.png")
-
-            await wait_and_click("combat/compass.png", double_click=True)
-            await wait_and_click("combat/5-3-P.png", double_click=True)
-            await wait_and_click("combat/line_ahead.png", double_click=True)
-            await wait_and_click("common/next.png", wait=3.0)
-            await wait_and_click("common/next.png")
-            await wait_and_click("combat/retreat.png")
-            start_button.on_click()
-        except asyncio.CancelledError:
-            return
-
-    async def wait_and_click(target, wait = 0.5, double_click = False):
-        # update text
-        ui_text.value = target
+    def update_status(status: str):
+        ui_text.value = status
         ui.page.update()
 
-        # find template
-        pos = None
-        while pos is None:
-            await asyncio.sleep(0.1)
-            image = wc.get_frame()
-            if image is not None:
-                pos = locate(image, [target])
-
-        # click
-        if double_click:
-            bg_mouse.double_click(pos)
-        else:
-            bg_mouse.click(pos)
-
-        # wait a minute
-        await wait_and_update_text(wait)
-
-    async def wait_and_update_text(seconds: float, interval: float = 0.05):
-        remaining = seconds
-        while remaining > 0:
-            ui_text.value = f"wait: {remaining:.2f}s"
-            ui.page.update()
-            await asyncio.sleep(interval)
-            remaining -= interval
-        ui_text.value = f"wait: 0s"
-        ui.page.update()
+    def update_countdown(remaining: float):
+        update_status(f"wait: {remaining:.2f}s" if remaining > 0 else "wait: 0s")
 
-    strategies["5-2"]._run = _run_5_2
-    strategies["5-3"]._run = _run_5_3
+    ui.on_status = update_status
+    for strategy in strategies.values():
+        strategy.on_status = update_status
+        strategy.on_wait = update_countdown
+        strategy.on_finished = start_button.on_click
 
 
 def override_ui():
     def toggle_strategy_execution():
         if not strategies[strategy_options.selected[0]].running:
+            strategies[strategy_options.selected[0]].formation = formation_options.selected[0]
+            strategies[strategy_options.selected[0]].recorder = FlightRecorder() if config.settings.record else None
             strategies[strategy_options.selected[0]].run()
+            ui.running = True
             start_button.content = f"Stop Strategy {strategy_options.selected[0]}"
             start_button.style.bgcolor = {"": "red"}
         else:
             strategies[strategy_options.selected[0]].stop()
+            ui.running = False
             ui_text.value = "Extension Strategy"
             start_button.content = f"Start Strategy {strategy_options.selected[0]}"
             start_button.style.bgcolor = {"": "blue"}
@@ -153,9 +91,12 @@ def main():
         for s in strategies.values():
             s.stop()
 
-    override_strategy()
+    def dump_recording():
+        return strategies[strategy_options.selected[0]].dump_recording()
+
     override_ui()
-    ui.run(None, close_all_strategies)
+    override_strategy()
+    ui.run(None, close_all_strategies, dump_recording)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,120 @@
+import argparse
+import random
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from benchmark_backends import evaluate, inside, recorded_frames, synthetic_frames, template_names
+from config import FeatureBackend
+import template_locator
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Rank template keypoints by repeatability and distinctiveness and report budget trade-offs.")
+    parser.add_argument("--frames", help="directory of recorded frames, laid out like templates/ "
+                                         "(e.g. frames/combat/compass/*.png)")
+    parser.add_argument("--samples", type=int, default=10, help="synthetic frames per template")
+    parser.add_argument("--backend", default=FeatureBackend.SIFT.value, choices=[b.value for b in FeatureBackend])
+    parser.add_argument("--budgets", type=int, nargs="+", default=[100, 50, 25], help="template budgets to report")
+    parser.add_argument("--frame-budget", type=int, default=template_locator.FRAME_KEYPOINT_BUDGET,
+                        help="keypoint budget for frames, 0 = unlimited")
+    parser.add_argument("--write", type=int, metavar="BUDGET",
+                        help=f"store the best BUDGET keypoints per template in {template_locator.KEYPOINTS_FILE.name}")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    np.random.seed(args.seed)
+    backend = FeatureBackend(args.backend)
+    template_locator.FRAME_KEYPOINT_BUDGET = args.frame_budget
+
+    templates = template_names()
+    if args.frames:
+        frames = {t: recorded_frames(Path(args.frames), t) for t in templates}
+    else:
+        frames = {t: synthetic_frames(t, args.samples) for t in templates}
+
+    rankings = {}
+    print(f"{'template':32} {'variant':8} {'found':>7} {'hits':>7} {'false+':>7} {'kp':>6} {'ms':>8}")
+    for template in templates:
+        # Score on the first half of the frames and evaluate on the second half
+        positives = frames[template]
+        negatives = [f for t, fs in frames.items() if Path(t).name != Path(template).name for f in fs]
+        negatives = random.sample(negatives, min(len(negatives), 2 * len(positives)))
+        half_p, half_n = len(positives) // 2, len(negatives) // 2
+
+        ranked = rank_keypoints(template, backend, positives[:half_p], negatives[:half_n])
+        rankings[template] = ranked
+
+        rows = [("all", None, None)]
+        rows += [(f"top-{b}", b, None) for b in args.budgets]
+        rows += [(f"prune-{b}", b, ranked) for b in args.budgets]
+        for label, budget, keypoints in rows:
+            _configure(template, backend, budget, keypoints)
+            print(evaluate(template, backend, positives[half_p:], negatives[half_n:], label))
+        _configure(template, backend, None, None)
+
+    if args.write:
+        # Selections of other backends are kept
+        for template, ranked in rankings.items():
+            template_locator.set_keypoint_selection(template, backend, ranked[:args.write])
+        template_locator.save_keypoint_selection()
+        print(f"wrote {template_locator.KEYPOINTS_FILE}")
+
+
+def rank_keypoints(template: str, backend: FeatureBackend, positives: list, negatives: list) -> list[cv2.KeyPoint]:
+    """
+    Order the template's keypoints from most to least useful.
+    A keypoint scores +1 for every positive frame where it is a RANSAC inlier of a correct match,
+    and -1 for every negative frame where it passes the ratio test.
+    """
+    image = cv2.imread(template_locator._resolve_template_path(template), cv2.IMREAD_GRAYSCALE)
+    kp, des = template_locator._create_detector(backend).detectAndCompute(image, None)
+    points = template_locator._keypoint_positions(kp)
+    scores = np.zeros(len(kp))
+
+    for frame, target in positives:
+        frame_points, frame_des = _frame_features(frame, backend)
+        matches = template_locator._match_features(des, frame_des, backend)
+        if len(matches) < 3:
+            continue
+        H, inliers = cv2.estimateAffine2D(
+            points[[m.queryIdx for m in matches]], frame_points[[m.trainIdx for m in matches]],
+            method=cv2.RANSAC, ransacReprojThreshold=5.0
+        )
+        if H is None or (target and not inside(template_locator._compute_template_center(image, H), target)):
+            continue
+        for m, inlier in zip(matches, inliers.ravel()):
+            scores[m.queryIdx] += inlier
+
+    for frame, _ in negatives:
+        frame_points, frame_des = _frame_features(frame, backend)
+        for m in template_locator._match_features(des, frame_des, backend):
+            scores[m.queryIdx] -= 1
+
+    # Ties are broken by detector response
+    order = sorted(range(len(kp)), key=lambda i: (scores[i], kp[i].response), reverse=True)
+    return [kp[i] for i in order]
+
+
+def _frame_features(frame: np.ndarray, backend: FeatureBackend) -> tuple[np.ndarray, np.ndarray]:
+    """Detect frame features the way locate does."""
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGRA2GRAY)
+    return template_locator._detect_features(gray, backend, template_locator.FRAME_KEYPOINT_BUDGET)
+
+
+def _configure(template: str, backend: FeatureBackend, budget: int | None,
+        keypoints: list[cv2.KeyPoint] | None) -> None:
+    """Set the template's keypoint budget and selection in template_locator."""
+    if budget is None:
+        template_locator.TEMPLATE_KEYPOINT_BUDGETS.pop(template, None)
+    else:
+        template_locator.TEMPLATE_KEYPOINT_BUDGETS[template] = budget
+
+    template_locator.set_keypoint_selection(template, backend, keypoints)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,324 @@
+import argparse
+import asyncio
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+
+import cv2
+import numpy as np
+
+import config
+from flight_recorder import FlightRecorder
+from sortie_strategy import SortieStrategy
+from frame_preprocessor import CropTransform, FramePreprocessor
+from strategy import Strategy
+from template_locator import TEMPLATE_ROOT
+
+# Size of the simulated poi game canvas
+FRAME_WIDTH = 1200
+FRAME_HEIGHT = 720
+
+# Simulated delays (in seconds) of the real backends
+CLICK_DELAY = 0.05
+DOUBLE_CLICK_DELAY = 0.1
+
+# Default range of the screen transition animation after a successful click
+ANIMATION_DELAY = (0.5, 1.5)
+
+
+@dataclass
+class Screen:
+    """A single game screen showing one clickable template."""
+    template: str
+    position: tuple[int, int]
+    animation: tuple[float, float] = ANIMATION_DELAY
+    ends_sortie: bool = False
+
+
+# Scripted screen sequences, in the order the game presents them.
+# Each scenario loops back to its first screen after the last one.
+SCENARIOS: dict[str, list[Screen]] = {
+    "combat": [
+        Screen("combat/compass.png", (600, 360), (2.0, 3.0)),
+        Screen("combat/line_ahead.png", (820, 260), (5.0, 8.0)),
+        Screen("combat/skip_night_battle.png", (760, 360), (1.0, 2.0)),
+        Screen("common/next.png", (1120, 650), (1.0, 2.0)),
+        Screen("common/next.png", (1120, 650), (1.0, 2.0)),
+        Screen("combat/retreat.png", (760, 360), (2.0, 3.0), ends_sortie=True),
+    ],
+    "5-2": [
+        Screen("port/sortie.png", (200, 360)),
+        Screen("sortie/sortie.png", (300, 350)),
+        Screen("sortie/world_5.png", (560, 680)),
+        Screen("sortie/5-2.png", (850, 270)),
+        Screen("sortie/confirm_1.png", (900, 650)),
+        Screen("sortie/confirm_2.png", (900, 650)),
+        Screen("combat/compass.png", (600, 360), (5.0, 8.0)),
+        Screen("common/next.png", (1120, 650), (3.0, 5.0)),
+        Screen("common/next.png", (1120, 650)),
+        Screen("combat/retreat.png", (760, 360), (2.0, 3.0), ends_sortie=True),
+    ],
+    "5-3": [
+        Screen("port/sortie.png", (200, 360)),
+        Screen("sortie/sortie.png", (300, 350)),
+        Screen("sortie/world_5.png", (560, 680)),
+        Screen("sortie/5-3.png", (850, 410)),
+        Screen("sortie/confirm_1.png", (900, 650)),
+        Screen("sortie/confirm_2.png", (900, 650)),
+        Screen("combat/compass.png", (600, 360), (5.0, 6.0)),
+        Screen("combat/compass.png", (600, 360), (2.0, 3.0)),
+        Screen("combat/line_ahead.png", (820, 260), (5.0, 8.0)),
+        Screen("common/next.png", (1120, 650), (3.0, 5.0)),
+        Screen("common/next.png", (1120, 650)),
+        Screen("combat/advance.png", (760, 360), (2.0, 3.0)),
+        Screen("combat/compass.png", (600, 360), (2.0, 3.0)),
+        Screen("combat/5-3-P.png", (700, 300), (2.0, 3.0)),
+        Screen("combat/line_ahead.png", (820, 260), (5.0, 8.0)),
+        Screen("common/next.png", (1120, 650), (3.0, 5.0)),
+        Screen("common/next.png", (1120, 650)),
+        Screen("combat/retreat.png", (760, 360), (2.0, 3.0), ends_sortie=True),
+    ],
+}
+
+
+@dataclass
+class Stats:
+    """Throughput and latency statistics collected by the simulator."""
+    sorties: int = 0
+    clicks: int = 0
+    misclicks: int = 0
+    latencies: list[float] = field(default_factory=list)
+
+    def report(self, wall_time: float, cpu_time: float) -> str:
+        """Format a human readable summary of the run."""
+        lines = [
+            f"duration:        {wall_time:.1f}s",
+            f"sorties:         {self.sorties} ({self.sorties * 3600 / wall_time:.1f}/h)",
+            f"clicks:          {self.clicks} (misclicks: {self.misclicks})",
+            f"cpu usage:       {cpu_time / wall_time * 100:.1f}% of one core",
+        ]
+        if self.latencies:
+            p50, p90, p99 = np.percentile(self.latencies, [50, 90, 99])
+            lines.append(
+                f"decision latency: p50={p50 * 1000:.0f}ms p90={p90 * 1000:.0f}ms "
+                f"p99={p99 * 1000:.0f}ms max={max(self.latencies) * 1000:.0f}ms"
+            )
+        return "\n".join(lines)
+
+
+class GameSimulator:
+    """A scripted state machine that renders synthetic game frames and reacts to clicks."""
+
+    def __init__(self, screens: list[Screen], background: np.ndarray | None = None,
+            noise: float = 4.0, jitter: int = 4, time_scale: float = 1.0) -> None:
+        """Initialize the simulator with a screen sequence and rendering options."""
+        self.screens = screens
+        self.background = background if background is not None else _default_background()
+        self.noise = noise
+        self.jitter = jitter
+        self.time_scale = time_scale
+        self.stats = Stats()
+
+        self._lock = threading.Lock()
+        self._index = 0
+        self._frame: np.ndarray | None = None
+        self._target: tuple[int, int, int, int] | None = None
+        self._visible_at = 0.0
+        self._templates: dict[str, np.ndarray] = {}
+        self._transition = self._add_noise(self.background.copy())
+        self._show(self.screens[0])
+
+    def render(self) -> np.ndarray:
+        """Return the current frame, switching screens once the animation has finished."""
+        with self._lock:
+            if self._frame is None and time.perf_counter() >= self._visible_at:
+                self._show(self.screens[self._index])
+            return self._frame if self._frame is not None else self._transition
+
+    @property
+    def target(self) -> (tuple[int, int, int, int] | None):
+        """Bounding box (x, y, w, h) of the clickable template, None during animations."""
+        return self._target
+
+    def click(self, position: tuple) -> None:
+        """Handle a click at the given client coordinates (x, y)."""
+        with self._lock:
+            self.stats.clicks += 1
+            if self._target is None:
+                # Clicks during animations (e.g. the second half of a double-click) are ignored
+                return
+            if not self._hit(position):
+                self.stats.misclicks += 1
+                return
+
+            screen = self.screens[self._index]
+            self.stats.latencies.append(time.perf_counter() - self._visible_at)
+            if screen.ends_sortie:
+                self.stats.sorties += 1
+
+            # Play the transition animation before the next screen becomes visible
+            self._index = (self._index + 1) % len(self.screens)
+            self._frame = None
+            self._target = None
+            self._visible_at = time.perf_counter() + random.uniform(*screen.animation) * self.time_scale
+
+    def _hit(self, position: tuple) -> bool:
+        """Check whether the position lies inside the clickable template."""
+        x, y, w, h = self._target
+        return x <= position[0] < x + w and y <= position[1] < y + h
+
+    def _show(self, screen: Screen) -> None:
+        """Compose the frame for the given screen and make it visible."""
+        template = self._load_template(screen.template)
+        h, w = template.shape[:2]
+        cx = screen.position[0] + random.randint(-self.jitter, self.jitter)
+        cy = screen.position[1] + random.randint(-self.jitter, self.jitter)
+        x = min(max(cx - w // 2, 0), self.background.shape[1] - w)
+        y = min(max(cy - h // 2, 0), self.background.shape[0] - h)
+
+        frame = self.background.copy()
+        roi = frame[y:y + h, x:x + w]
+        alpha = template[:, :, 3:4].astype(np.float32) / 255
+        roi[:] = (template * alpha + roi * (1 - alpha)).astype(np.uint8)
+
+        self._frame = self._add_noise(frame)
+        self._target = (x, y, w, h)
+        self._visible_at = time.perf_counter()
+
+    def _add_noise(self, frame: np.ndarray) -> np.ndarray:
+        """Add gaussian pixel noise to the color channels of the frame."""
+        if self.noise > 0:
+            noise = np.random.normal(0, self.noise, frame.shape[:2] + (3,))
+            frame[:, :, :3] = np.clip(frame[:, :, :3] + noise, 0, 255).astype(np.uint8)
+        return frame
+
+    def _load_template(self, path: str) -> np.ndarray:
+        """Load and cache a template as a BGRA image."""
+        if path not in self._templates:
+            template = cv2.imread(str(TEMPLATE_ROOT / path), cv2.IMREAD_UNCHANGED)
+            if template is None:
+                raise FileNotFoundError(path)
+            if template.shape[2] == 3:
+                template = cv2.cvtColor(template, cv2.COLOR_BGR2BGRA)
+            self._templates[path] = template
+        return self._templates[path]
+
+
+class SimulatedCapture:
+    """A drop-in replacement for WindowCapture that reads frames from a GameSimulator."""
+
+    def __init__(self, simulator: GameSimulator, scale: float = 1.0) -> None:
+        self._simulator = simulator
+        self._preprocessor = FramePreprocessor(scale)
+        self._transform = CropTransform()
+
+    def start(self) -> None:
+        """Start capturing frames."""
+
+    def stop(self) -> None:
+        """Stop capturing frames."""
+
+    def get_frame(self) -> (np.ndarray | None):
+        """Retrieve the current simulated frame."""
+        frame, self._transform = self._preprocessor.process(self._simulator.render())
+        return frame
+
+    @property
+    def transform(self) -> CropTransform:
+        """Transform of the frame last returned by get_frame."""
+        return self._transform
+
+    def to_client(self, position: tuple) -> tuple[int, int]:
+        """Map a position in the frame last returned by get_frame back to simulated client coordinates."""
+        return self._transform.to_client(position)
+
+
+class SimulatedMouse:
+    """A drop-in replacement for BackgroundMouse that clicks into a GameSimulator."""
+
+    def __init__(self, simulator: GameSimulator) -> None:
+        self._simulator = simulator
+
+    def click(self, position: tuple) -> None:
+        """Perform a click at the given client coordinates (x, y)."""
+        time.sleep(CLICK_DELAY)
+        self._simulator.click(position)
+
+    def double_click(self, position: tuple) -> None:
+        """Perform a double-click at the given client coordinates (x, y)."""
+        self.click(position)
+        time.sleep(DOUBLE_CLICK_DELAY)
+        self.click(position)
+
+    def move_to(self, position: tuple) -> None:
+        """Mouse moves have no effect on the simulated game."""
+
+
+def _default_background() -> np.ndarray:
+    """Create a dark textured background resembling the game canvas."""
+    rng = np.random.default_rng(0)
+    texture = rng.integers(0, 255, (FRAME_HEIGHT // 16, FRAME_WIDTH // 16, 3), dtype=np.uint8)
+    texture = cv2.resize(texture, (FRAME_WIDTH, FRAME_HEIGHT), interpolation=cv2.INTER_CUBIC)
+    background = cv2.cvtColor(texture // 2 + 20, cv2.COLOR_BGR2BGRA)
+    return background
+
+
+def _load_background(path: str) -> np.ndarray:
+    """Load a background image and resize it to the simulated canvas."""
+    background = cv2.imread(path, cv2.IMREAD_COLOR)
+    if background is None:
+        raise FileNotFoundError(path)
+    background = cv2.resize(background, (FRAME_WIDTH, FRAME_HEIGHT))
+    return cv2.cvtColor(background, cv2.COLOR_BGR2BGRA)
+
+
+async def simulate(strategy: Strategy, simulator: GameSimulator, duration: float) -> str:
+    """Run the strategy against the simulator for the given duration and return a report."""
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    strategy.run()
+    try:
+        await asyncio.sleep(duration)
+    finally:
+        strategy.stop()
+    wall_time = time.perf_counter() - wall_start
+    cpu_time = time.process_time() - cpu_start
+    return simulator.stats.report(wall_time, cpu_time)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a strategy against a simulated game.")
+    parser.add_argument("--scenario", choices=SCENARIOS.keys(), default="combat")
+    parser.add_argument("--duration", type=float, default=60.0, help="seconds to simulate")
+    parser.add_argument("--background", help="background image for the game canvas")
+    parser.add_argument("--noise", type=float, default=4.0, help="std-dev of pixel noise")
+    parser.add_argument("--time-scale", type=float, default=1.0, help="factor for animation delays")
+    parser.add_argument("--scale", type=float, default=1.0, help="capture downsampling factor")
+    parser.add_argument("--record", action="store_true", help="dump a flight recording at the end")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        random.seed(args.seed)
+        np.random.seed(args.seed)
+
+    background = _load_background(args.background) if args.background else None
+    simulator = GameSimulator(SCENARIOS[args.scenario], background, args.noise,
+                              time_scale=args.time_scale)
+    capture, mouse = SimulatedCapture(simulator, args.scale), SimulatedMouse(simulator)
+
+    config.settings.advance = config.TriState.DISABLED
+    config.settings.night_battle = config.TriState.DISABLED
+    recorder = FlightRecorder() if args.record else None
+    if args.scenario == "combat":
+        strategy = Strategy(capture, mouse, recorder)
+    else:
+        strategy = SortieStrategy(capture, mouse, args.scenario, max_sorties=0, recorder=recorder)
+
+    print(asyncio.run(simulate(strategy, simulator, args.duration)))
+    if recorder:
+        print(f"recording:       {recorder.dump()}")
+
+
+if __name__ == "__main__":
+    main()
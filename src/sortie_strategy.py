@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING, Callable
+
+from strategy import Strategy
+
+if TYPE_CHECKING:
+    from background_mouse import BackgroundMouse
+    from flight_recorder import FlightRecorder
+    from window_capture import WindowCapture
+
+# Interval (in seconds) between template searches while waiting for a screen
+SEARCH_INTERVAL = 0.1
+
+# Interval (in seconds) between countdown updates while waiting after a click
+COUNTDOWN_INTERVAL = 0.05
+
+# Maps supported by SortieStrategy
+MAPS = ("5-2", "5-3")
+
+# Formation choices: "x" keeps the game default
+FORMATIONS = ("x", "line_ahead")
+
+
+class SortieStrategy(Strategy):
+    """Scripted strategy that sorties from the port to a fixed map and retreats after the battle."""
+
+    def __init__(self, wc: WindowCapture, bg_mouse: BackgroundMouse, map_name: str,
+            formation: str = "x", max_sorties: int = 1, recorder: FlightRecorder | None = None):
+        """Initialize for a map in MAPS; max_sorties of 0 repeats until stopped."""
+        super().__init__(wc, bg_mouse, recorder)
+        if map_name not in MAPS:
+            raise ValueError(f"map_name must be one of {MAPS}")
+        self.map_name = map_name
+        self.formation = formation
+        self.max_sorties = max_sorties
+        self.sorties = 0
+
+        # Optional callbacks for countdown display and for when all sorties are done
+        self.on_wait: Callable[[float], None] | None = None
+        self.on_finished: Callable[[], None] | None = None
+
+    async def _run(self) -> None:
+        """Run sorties until max_sorties is reached or the strategy is stopped."""
+        try:
+            self.sorties = 0
+            while self.running and (self.max_sorties == 0 or self.sorties < self.max_sorties):
+                if self.map_name == "5-2":
+                    await self._run_5_2()
+                else:
+                    await self._run_5_3()
+                self.sorties += 1
+                self._report(f"sortie {self.sorties} finished")
+            if self.on_finished:
+                self.on_finished()
+        except asyncio.CancelledError:
+            return
+
+    async def _run_5_2(self) -> None:
+        await self._wait_and_click("port/sortie.png", double_click=True)
+        await self._wait_and_click("sortie/sortie.png", double_click=True)
+        await self._wait_and_click("sortie/world_5.png")
+        await self._wait_and_click("sortie/5-2.png")
+        await self._wait_and_click("sortie/confirm_1.png")
+        await self._wait_and_click("sortie/confirm_2.png")
+        await self._wait_and_click("combat/compass.png")
+        if self.formation != "x":
+            await self._wait_and_click(f"combat/{self.formation}.png")
+        await self._wait_and_click("common/next.png", wait=3.0)
+        await self._wait_and_click("common/next.png")
+        await self._wait_and_click("combat/retreat.png")
+
+    async def _run_5_3(self) -> None:
+        await self._wait_and_click("port/sortie.png", double_click=True)
+        await self._wait_and_click("sortie/sortie.png", double_click=True)
+        await self._wait_and_click("sortie/world_5.png")
+        await self._wait_and_click("sortie/5-3.png")
+        await self._wait_and_click("sortie/confirm_1.png")
+        await self._wait_and_click("sortie/confirm_2.png")
+
+        await self._wait_and_click("combat/compass.png", wait=5.0)
+        await self._wait_and_click("combat/compass.png")
+        await self._wait_and_click("combat/line_ahead.png")
+        await self._wait_and_click("common/next.png", wait=3.0)
+        await self._wait_and_click("common/next.png")
+        await self._wait_and_click("combat/advance.png")
+
+        await self._wait_and_click("combat/compass.png", double_click=True)
+        await self._wait_and_click("combat/5-3-P.png", double_click=True)
+        await self._wait_and_click("combat/line_ahead.png", double_click=True)
+        await self._wait_and_click("common/next.png", wait=3.0)
+        await self._wait_and_click("common/next.png")
+        await self._wait_and_click("combat/retreat.png")
+
+    async def _wait_and_click(self, target: str, wait: float = 0.5, double_click: bool = False) -> None:
+        """Wait until the target template appears, click it and wait for the given seconds."""
+        self._report(target)
+
+        # find template
+        match = None
+        while match is None:
+            await asyncio.sleep(SEARCH_INTERVAL)
+            match = self._find_template([target])
+
+        # click
+        pos = match[1]
+        if double_click:
+            self.mouse.double_click(pos)
+        else:
+            self.mouse.click(pos)
+
+        # wait a moment
+        await self._wait(wait)
+
+    async def _wait(self, seconds: float) -> None:
+        """Sleep for the given seconds, reporting the remaining time to the countdown callback."""
+        remaining = seconds
+        while remaining > 0:
+            if self.on_wait:
+                self.on_wait(remaining)
+            await asyncio.sleep(COUNTDOWN_INTERVAL)
+            remaining -= COUNTDOWN_INTERVAL
+        if self.on_wait:
+            self.on_wait(0)
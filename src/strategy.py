@@ -1,30 +1,49 @@
+from __future__ import annotations
+
 import asyncio
-from background_mouse import BackgroundMouse
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable
+
 import config
-from template_locator import locate
-from window_capture import WindowCapture
+from flight_recorder import Decision, FlightRecorder
+from template_locator import find_template
+
+if TYPE_CHECKING:
+    # Windows-only backends; imported for typing so simulated backends work elsewhere
+    from background_mouse import BackgroundMouse
+    from window_capture import WindowCapture
 
 # Interval (in seconds) between template searches to avoid CPU overuse
 TEMPLATE_SEARCH_INTERVAL = 0.05
 
 
 class Strategy:
-    def __init__(self, wc: WindowCapture, bg_mouse: BackgroundMouse):
+    def __init__(self, wc: WindowCapture, bg_mouse: BackgroundMouse, recorder: FlightRecorder | None = None):
         self.capture: WindowCapture = wc
         self.mouse: BackgroundMouse = bg_mouse
+        self.recorder: FlightRecorder | None = recorder
         self.running: bool = False
         self.task: asyncio.Task | None = None
 
+        # Optional progress callback, so strategies run with or without a UI
+        self.on_status: Callable[[str], None] | None = None
+
     def run(self):
         """Start the strategy by creating an async task"""
         self.running = True
         self.capture.start()
+        if self.recorder:
+            self.recorder.start()
         self.task = asyncio.create_task(self._run())
+        self.task.add_done_callback(self._on_task_done)
 
     def stop(self):
         """Stop the strategy and cancel the async task"""
         self.running = False
         self.capture.stop()
+        if self.recorder:
+            self.recorder.stop()
         if self.task and not self.task.done():
             self.task.cancel()
             self.task = None
@@ -62,10 +81,42 @@ class Strategy:
             # Graceful exit when the task is cancelled
             return
 
+    def _on_task_done(self, task: asyncio.Task) -> None:
+        """Keep the frames leading up to an error that ended the task"""
+        if self.recorder and not task.cancelled() and task.exception() is not None:
+            self.recorder.dump()
+
     def _click_first_template_path(self, template_paths: list[str]):
         """Try to locate the first matching template and perform a mouse click"""
+        match = self._find_template(template_paths)
+        if match:
+            self.mouse.click(match[1])
+            self._report(f"click {match[0]}")
+
+    def _find_template(self, template_paths: list[str]) -> (tuple[str, tuple[int, int]] | None):
+        """
+        Grab a frame and return the first matching template with its position in client coordinates.
+        The frame and the outcome are kept by the flight recorder, if any.
+        """
         image = self.capture.get_frame()
-        if image is not None:
-            pos = locate(image, template_paths)
-            if pos is not None:
-                self.mouse.click(pos)
+        if image is None:
+            return None
+
+        match = find_template(image, template_paths)
+        pos = self.capture.to_client(match[1]) if match else None
+        if self.recorder:
+            frame_id = self.recorder.record_frame(image, self.capture.transform)
+            decision = Decision(time.time(), frame_id, template_paths)
+            if match:
+                decision.template, decision.position, decision.score = match
+            self.recorder.record_decision(decision)
+        return (match[0], pos) if match else None
+
+    def dump_recording(self) -> (Path | None):
+        """Write the flight recorder's buffer to disk and return the dump directory, None if not recording"""
+        return self.recorder.dump() if self.recorder else None
+
+    def _report(self, status: str) -> None:
+        """Forward a progress message to the status callback, if any"""
+        if self.on_status:
+            self.on_status(status)
@@ -0,0 +1,93 @@
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable
+
+import numpy as np
+
+
+@dataclass
+class CacheStats:
+    """Hit/miss counters and memory usage of a TemplateCache."""
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    entries: int = 0
+    bytes: int = 0
+
+
+class TemplateCache:
+    """
+    A thread-safe LRU cache of template features with a memory budget.
+    Entries are stored compactly: keypoints as an (N, 2) float32 array of positions,
+    float descriptors optionally as float16. Half-precision descriptors are widened
+    to a new float32 array on every hit, trading allocations for memory.
+    """
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024, half_precision: bool = False) -> None:
+        """Initialize the cache with a memory budget in bytes."""
+        self.max_bytes = max_bytes
+        self.half_precision = half_precision
+        self._entries: OrderedDict[object, tuple[np.ndarray, np.ndarray, np.ndarray | None]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = CacheStats()
+
+    def get(self, key) -> (tuple[np.ndarray, np.ndarray, np.ndarray | None] | None):
+        """Return (image, keypoint positions, descriptors) for the key, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats.hits += 1
+
+        image, points, des = entry
+        # Matchers need float32; the copy is not cached, or the memory saved would be lost
+        if des is not None and des.dtype == np.float16:
+            des = des.astype(np.float32)
+        return image, points, des
+
+    def put(self, key, image: np.ndarray, points: np.ndarray, des: np.ndarray | None) -> None:
+        """Store an entry, evicting the least recently used ones to stay within the budget."""
+        if self.half_precision and des is not None and des.dtype == np.float32:
+            des = des.astype(np.float16)
+        entry = (image, points, des)
+        size = _entry_size(entry)
+
+        with self._lock:
+            if key in self._entries:
+                self._stats.bytes -= _entry_size(self._entries.pop(key))
+            self._entries[key] = entry
+            self._stats.bytes += size
+
+            # Always keep the newest entry, even if it alone exceeds the budget
+            while self._stats.bytes > self.max_bytes and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                self._stats.bytes -= _entry_size(evicted)
+                self._stats.evictions += 1
+            self._stats.entries = len(self._entries)
+
+    def discard(self, predicate: Callable[[object], bool]) -> None:
+        """Remove the entries whose key satisfies the predicate."""
+        with self._lock:
+            for key in [k for k in self._entries if predicate(k)]:
+                self._stats.bytes -= _entry_size(self._entries.pop(key))
+            self._stats.entries = len(self._entries)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._entries.clear()
+            self._stats.entries = 0
+            self._stats.bytes = 0
+
+    def stats(self) -> CacheStats:
+        """Return a snapshot of the cache statistics."""
+        with self._lock:
+            return CacheStats(**self._stats.__dict__)
+
+
+def _entry_size(entry: tuple[np.ndarray, np.ndarray, np.ndarray | None]) -> int:
+    """Return the number of bytes held by the arrays of an entry."""
+    return sum(a.nbytes for a in entry if a is not None)
@@ -1,89 +1,166 @@
+import json
 from pathlib import Path
 import cv2
 import numpy as np
 
+from buffer_pool import thread_pool
+import config
+from config import FeatureBackend
+from template_cache import CacheStats, TemplateCache
+
 # Define the root directory where template images are stored.
-_TEMPLATE_ROOT = Path.cwd() / "templates"
+TEMPLATE_ROOT = Path.cwd() / "templates"
+
+# Per-template feature backend overrides, keyed by template path as passed to locate.
+# Templates without an entry use config.settings.feature_backend.
+TEMPLATE_BACKENDS: dict[str, FeatureBackend] = {}
+
+# Index binary descriptors with FLANN LSH instead of brute-force Hamming matching.
+USE_LSH = False
+
+# Keypoint budgets (0 = unlimited) for frames, for templates by default, and per-template overrides.
+# The strongest keypoints by detector response are kept.
+FRAME_KEYPOINT_BUDGET = 0
+TEMPLATE_KEYPOINT_BUDGET = 0
+TEMPLATE_KEYPOINT_BUDGETS: dict[str, int] = {}
+
+# Offline-selected template keypoints written by prune_keypoints.py, keyed by template path and backend.
+# Entries are ordered from most to least useful, so budgets keep the best ones; change them with set_keypoint_selection.
+KEYPOINTS_FILE = TEMPLATE_ROOT / "keypoints.json"
+_keypoint_selection: dict[str, dict[str, list]] | None = None
+
+# Memory budget of the template feature cache, and whether to store SIFT descriptors as float16.
+# Half precision halves descriptor memory, but FLANN needs float32, so every cache hit allocates
+# a widened copy; only enable it when memory matters more than per-frame allocations.
+# Read when the cache is created; use configure_cache to change them at runtime.
+TEMPLATE_CACHE_BYTES = 32 * 1024 * 1024
+TEMPLATE_CACHE_HALF_PRECISION = False
 
-# Cache for storing template images and their associated keypoints and descriptors.
-_template_cache: dict[str, tuple[np.ndarray, list, np.ndarray]] = {}
+# Cache for storing template images and their associated keypoint positions and descriptors.
+_template_cache = TemplateCache(TEMPLATE_CACHE_BYTES, TEMPLATE_CACHE_HALF_PRECISION)
+
+
+def configure_cache(max_bytes: int | None = None, half_precision: bool | None = None) -> None:
+    """Replace the template feature cache with one using the given budget and precision; None keeps the current value."""
+    global TEMPLATE_CACHE_BYTES, TEMPLATE_CACHE_HALF_PRECISION, _template_cache
+    if max_bytes is not None:
+        TEMPLATE_CACHE_BYTES = max_bytes
+    if half_precision is not None:
+        TEMPLATE_CACHE_HALF_PRECISION = half_precision
+    _template_cache = TemplateCache(TEMPLATE_CACHE_BYTES, TEMPLATE_CACHE_HALF_PRECISION)
+
+
+def cache_stats() -> CacheStats:
+    """Return hit/miss counters and memory usage of the template feature cache."""
+    return _template_cache.stats()
 
 
 def locate(
         image: np.ndarray,
         template_paths: str | list[str],
         ratio_thresh: float = 0.7,
-        sim_thresh: float = 0.7
+        sim_thresh: float = 0.7,
+        backend: FeatureBackend | None = None
     ) -> (tuple[int, int] | None):
-    """Locate the template in the given image and return the center point."""
-    image, image_kp, image_des = _extract_image_features(image)
+    """
+    Locate the template in the given BGRA or grayscale image and return the center point.
+    If backend is None, each template uses its configured feature backend.
+    """
+    match = find_template(image, template_paths, ratio_thresh, sim_thresh, backend)
+    return match[1] if match else None
+
+
+def find_template(
+        image: np.ndarray,
+        template_paths: str | list[str],
+        ratio_thresh: float = 0.7,
+        sim_thresh: float = 0.7,
+        backend: FeatureBackend | None = None
+    ) -> (tuple[str, tuple[int, int], float] | None):
+    """Like locate, but return the matched template path, center point and similarity score."""
+    if image.ndim == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_BGRA2GRAY, dst=thread_pool().get("gray", image.shape[:2]))
+
+    # Image features are extracted lazily, once per backend in use
+    image_features: dict[FeatureBackend, tuple[np.ndarray, np.ndarray]] = {}
 
     if isinstance(template_paths, str):
         template_paths = [template_paths]
 
     for template_path in template_paths:
-        template, template_kp, template_des = _load_template_features(template_path)
+        template_backend = backend or _resolve_backend(template_path)
+        template, template_kp, template_des = load_template_features(template_path, template_backend)
+        if template_backend not in image_features:
+            image_features[template_backend] = _detect_features(image, template_backend, FRAME_KEYPOINT_BUDGET)
+        image_kp, image_des = image_features[template_backend]
 
         # Match features and compute homography
-        good_matches = _match_features(template_des, image_des, ratio_thresh)
+        good_matches = _match_features(template_des, image_des, template_backend, ratio_thresh)
         H = _compute_affine(template_kp, image_kp, good_matches)
         if H is None:
             continue
 
         # Verification using template matching
-        if not _verify_template_match(image, template, H, sim_thresh):
+        score = _verify_template_match(image, template, H)
+        if not score >= sim_thresh:  # also rejects NaN scores
             continue
 
         # Return center point
-        return _compute_template_center(template, H)
+        return template_path, _compute_template_center(template, H), score
 
     # Return None if no template was matched
     return None
 
 
-def _load_template_features(path: str) -> tuple[np.ndarray, list, np.ndarray]:
+def _resolve_backend(path: str) -> FeatureBackend:
+    """Return the feature backend configured for the template."""
+    return TEMPLATE_BACKENDS.get(path, config.settings.feature_backend)
+
+
+def load_template_features(path: str, backend: FeatureBackend) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
     """Load and cache the template image and extract features."""
     template_path = _resolve_template_path(path)
-    if template_path in _template_cache:
-        return _template_cache[template_path]
+    # Budgets are part of the key so changing them takes effect; selections are changed through set_keypoint_selection
+    budget = TEMPLATE_KEYPOINT_BUDGETS.get(path, TEMPLATE_KEYPOINT_BUDGET)
+    key = (template_path, backend, budget)
+    cached = _template_cache.get(key)
+    if cached is not None:
+        return cached
 
     template = cv2.imread(template_path, cv2.IMREAD_GRAYSCALE)
     if template is None:
         raise FileNotFoundError(template_path)
 
-    kp, des = _detect_features(template)
-    _template_cache[template_path] = (template, kp, des)
+    selected = _selected_keypoints(path, backend)
+    if selected is not None:
+        kp, des = _compute_features(template, backend, selected[:budget] if budget else selected)
+    else:
+        kp, des = _detect_features(template, backend, budget)
+    _template_cache.put(key, template, kp, des)
     return template, kp, des
 
 
-def _extract_image_features(img: np.ndarray) -> tuple[np.ndarray, list, np.ndarray]:
-    """Convert image to grayscale and extract features."""
-    gray = cv2.cvtColor(img, cv2.COLOR_BGRA2GRAY)
-    kp, des = _detect_features(gray)
-    return gray, kp, des
-
-
-def _match_features(des_t: np.ndarray, des_i: np.ndarray, threshold=0.7) -> list[cv2.DMatch]:
-    """Match template features to image features using FLANN and ratio test."""
-    FLANN_INDEX_KDTREE = 1
-    index_params = dict(algorithm=FLANN_INDEX_KDTREE, trees=5)
-    search_params = dict(checks=50)
-    flann = cv2.FlannBasedMatcher(index_params, search_params)
-    matches = flann.knnMatch(des_t, des_i, k=2)
-    return [m for m, n in matches if m.distance < threshold * n.distance]
+def _match_features(des_t: np.ndarray, des_i: np.ndarray, backend: FeatureBackend,
+        threshold=0.7) -> list[cv2.DMatch]:
+    """Match template features to image features using the backend's matcher and ratio test."""
+    if des_t is None or des_i is None or len(des_i) < 2:
+        return []
+    matches = _create_matcher(backend).knnMatch(des_t, des_i, k=2)
+    # LSH may return fewer than two neighbours for a descriptor
+    return [p[0] for p in matches if len(p) == 2 and p[0].distance < threshold * p[1].distance]
 
 
-def _compute_affine(kp1: list, kp2: list, matches: list[cv2.DMatch]) -> (np.ndarray | None):
+def _compute_affine(kp1: np.ndarray, kp2: np.ndarray, matches: list[cv2.DMatch]) -> (np.ndarray | None):
     """
-    Compute affine transform from matched keypoints.
+    Compute affine transform from matched keypoint positions.
     Affine includes rotation, scale, translation but no full perspective.
     Return None if insufficient matches.
     """
     if len(matches) < 3:  # Affine needs at least 3 points
         return None
 
-    src_pts = np.float32([kp1[m.queryIdx].pt for m in matches]).reshape(-1, 2)
-    dst_pts = np.float32([kp2[m.trainIdx].pt for m in matches]).reshape(-1, 2)
+    src_pts = kp1[[m.queryIdx for m in matches]]
+    dst_pts = kp2[[m.trainIdx for m in matches]]
 
     # Estimate affine transform using RANSAC
     H, _ = cv2.estimateAffine2D(src_pts, dst_pts, method=cv2.RANSAC, ransacReprojThreshold=5.0)
@@ -91,13 +168,16 @@ def _compute_affine(kp1: list, kp2: list, matches: list[cv2.DMatch]) -> (np.ndar
     return H  # shape (2, 3) for warpAffine
 
 
-def _verify_template_match(image: np.ndarray, template: np.ndarray, H: np.ndarray,
-        sim_thresh=0.8) -> bool:
-    """Warp the template using the homography and verify similarity with template matching."""
-    warped = cv2.warpAffine(template, H, (image.shape[1], image.shape[0]))
-    mask = (warped > 0).astype(np.uint8)
+def _verify_template_match(image: np.ndarray, template: np.ndarray, H: np.ndarray) -> float:
+    """Warp the template using the homography and return its similarity from template matching."""
+    # Warp and mask into frame-sized scratch buffers reused across calls
+    pool = thread_pool()
+    warped = pool.get("warped", image.shape)
+    mask = pool.get("mask", image.shape)
+    cv2.warpAffine(template, H, (image.shape[1], image.shape[0]), dst=warped)
+    cv2.threshold(warped, 0, 1, cv2.THRESH_BINARY, dst=mask)
     res = cv2.matchTemplate(image, warped, cv2.TM_CCOEFF_NORMED, mask=mask)
-    return np.max(res) >= sim_thresh
+    return float(np.max(res))
 
 
 def _compute_template_center(template: np.ndarray, H: np.ndarray) -> tuple[int, int]:
@@ -106,7 +186,7 @@ def _compute_template_center(template: np.ndarray, H: np.ndarray) -> tuple[int,
     pts = np.float32([[0,0],[w,0],[w,h],[0,h]]).reshape(-1,1,2)
     projected = cv2.transform(pts, H)
     center_x, center_y = projected[:,0,:].mean(axis=0).astype(int)
-    return (center_x, center_y)
+    return (int(center_x), int(center_y))
 
 
 def _resolve_template_path(path: str) -> str:
@@ -114,11 +194,99 @@ def _resolve_template_path(path: str) -> str:
     p = Path(path)
     if p.is_absolute():
         return str(p)
-    return str(_TEMPLATE_ROOT / p)
+    return str(TEMPLATE_ROOT / p)
+
+
+def set_keypoint_selection(path: str, backend: FeatureBackend, keypoints: list[cv2.KeyPoint] | None) -> None:
+    """Select the template's keypoints for the backend, best first, or remove its selection if None."""
+    selection = _load_keypoint_selection().setdefault(path, {})
+    if keypoints is None:
+        selection.pop(backend.value, None)
+    else:
+        selection[backend.value] = [
+            [k.pt[0], k.pt[1], k.size, k.angle, k.response, k.octave, k.class_id] for k in keypoints
+        ]
+    # Drop the template's cached features, whatever their budget
+    template_path = _resolve_template_path(path)
+    _template_cache.discard(lambda key: key[0] == template_path and key[1] == backend)
+
+
+def save_keypoint_selection() -> None:
+    """Write the current keypoint selections of all templates and backends to KEYPOINTS_FILE."""
+    KEYPOINTS_FILE.write_text(json.dumps(_load_keypoint_selection(), indent=1))
+
+
+def _load_keypoint_selection() -> dict[str, dict[str, list]]:
+    """Return the offline keypoint selection, loading KEYPOINTS_FILE on first use."""
+    global _keypoint_selection
+    if _keypoint_selection is None:
+        _keypoint_selection = json.loads(KEYPOINTS_FILE.read_text()) if KEYPOINTS_FILE.exists() else {}
+    return _keypoint_selection
+
+
+def _selected_keypoints(path: str, backend: FeatureBackend) -> (list[cv2.KeyPoint] | None):
+    """Return the offline-selected keypoints of the template, or None if it has no selection."""
+    entries = _load_keypoint_selection().get(path, {}).get(backend.value)
+    if entries is None:
+        return None
+    # Each entry is [x, y, size, angle, response, octave, class_id]
+    return [
+        cv2.KeyPoint(x, y, size, angle, response, int(octave), int(class_id))
+        for x, y, size, angle, response, octave, class_id in entries
+    ]
+
+
+def _create_detector(backend: FeatureBackend, budget: int = 0) -> cv2.Feature2D:
+    """Create the keypoint detector and descriptor extractor of the backend."""
+    match backend:
+        case FeatureBackend.ORB:
+            # Smaller border and patch than the defaults so small buttons still yield keypoints
+            return cv2.ORB.create(nfeatures=budget or 2000, edgeThreshold=15, patchSize=15)
+        case FeatureBackend.AKAZE:
+            return cv2.AKAZE.create()
+        case _:
+            return cv2.SIFT.create(nfeatures=budget)
+
+
+def _detect_features(img: np.ndarray, backend: FeatureBackend = FeatureBackend.SIFT,
+        budget: int = 0) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Detect keypoints and descriptors with the given backend, keeping at most budget keypoints.
+    Return keypoint positions as (N, 2) array.
+    """
+    kp, des = _create_detector(backend, budget).detectAndCompute(img, None)
+    if budget and len(kp) > budget:
+        # AKAZE has no built-in limit: keep the strongest responses
+        order = np.argsort([-k.response for k in kp])[:budget]
+        kp, des = [kp[i] for i in order], des[order]
+    return _keypoint_positions(kp), des
+
+
+def _compute_features(img: np.ndarray, backend: FeatureBackend,
+        keypoints: list[cv2.KeyPoint]) -> tuple[np.ndarray, np.ndarray]:
+    """Compute descriptors for given keypoints, returning keypoint positions as (N, 2) array."""
+    kp, des = _create_detector(backend).compute(img, keypoints)
+    return _keypoint_positions(kp), des
+
+
+def _keypoint_positions(kp: list[cv2.KeyPoint]) -> np.ndarray:
+    """Convert keypoints to an (N, 2) float32 array of positions."""
+    return np.float32([k.pt for k in kp]).reshape(-1, 2)
+
 
+def _create_matcher(backend: FeatureBackend) -> cv2.DescriptorMatcher:
+    """Create a descriptor matcher suited to the backend's descriptor type."""
+    if backend == FeatureBackend.SIFT:
+        # Float descriptors: KD-tree index
+        FLANN_INDEX_KDTREE = 1
+        index_params = dict(algorithm=FLANN_INDEX_KDTREE, trees=5)
+        search_params = dict(checks=50)
+        return cv2.FlannBasedMatcher(index_params, search_params)
 
-def _detect_features(img: np.ndarray) -> tuple[list, np.ndarray]:
-    """Detect SIFT keypoints and descriptors."""
-    sift = cv2.SIFT.create()
-    kp, des = sift.detectAndCompute(img, None)
-    return kp, des
+    # Binary descriptors: Hamming distance
+    if USE_LSH:
+        FLANN_INDEX_LSH = 6
+        index_params = dict(algorithm=FLANN_INDEX_LSH, table_number=6, key_size=12, multi_probe_level=1)
+        search_params = dict(checks=50)
+        return cv2.FlannBasedMatcher(index_params, search_params)
+    return cv2.BFMatcher(cv2.NORM_HAMMING)
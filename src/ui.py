@@ -37,6 +37,9 @@ class UI:
         self.running: bool = False
         self.run_strategy = None
         self.stop_strategy = None
+        self.dump_recording = None
+        # Optional callback showing status messages, for layouts that replace the status text
+        self.on_status = None
 
         # Toolbar
         self.always_on_top_button = ft.IconButton(
@@ -51,8 +54,23 @@ class UI:
             tooltip=config.CaptureMode.SINGLE.value,
             on_click=self._toggle_capture_mode
         )
+        self.record_button = ft.IconButton(
+            icon=ft.Icons.RADIO_BUTTON_UNCHECKED,
+            icon_color="white",
+            tooltip="Not recording",
+            on_click=self._toggle_record
+        )
+        self.dump_button = ft.IconButton(
+            icon=ft.Icons.SAVE,
+            icon_color="white",
+            tooltip="Save recording",
+            disabled=True,
+            on_click=self._dump_recording
+        )
         self.toolbar = ft.Row(
             controls=[
+                self.dump_button,
+                self.record_button,
                 self.always_on_top_button,
                 self.capture_mode_button
             ],
@@ -108,10 +126,11 @@ class UI:
             animate=ft.Animation(ANIMATION_DURATION, ANIMATION_CURVE),
         )
 
-    def run(self, run_strategy, stop_strategy) -> None:
+    def run(self, run_strategy, stop_strategy, dump_recording=None) -> None:
         """Initialize callbacks and start the Flet app."""
         self.run_strategy = run_strategy
         self.stop_strategy = stop_strategy
+        self.dump_recording = dump_recording
         ft.run(self._main)
 
     def _main(self, page: ft.Page) -> None:
@@ -159,6 +178,32 @@ class UI:
 
         self.capture_mode_button.tooltip = config.settings.capture_mode.value
 
+    def _toggle_record(self) -> None:
+        """Toggle the flight recorder for the next strategy run."""
+        if self.running:
+            return
+
+        config.settings.toggle_record()
+
+        if config.settings.record:
+            self.record_button.icon = ft.Icons.RADIO_BUTTON_CHECKED
+            self.record_button.icon_color = "red"
+            self.record_button.tooltip = "Recording"
+        else:
+            self.record_button.icon = ft.Icons.RADIO_BUTTON_UNCHECKED
+            self.record_button.icon_color = "white"
+            self.record_button.tooltip = "Not recording"
+        self.dump_button.disabled = not config.settings.record
+
+    def _dump_recording(self) -> None:
+        """Save the flight recorder's buffer and show where it went."""
+        path = self.dump_recording() if self.dump_recording else None
+        message = f"Recording saved: {path.name}" if path else "Nothing recorded"
+        if self.on_status:
+            self.on_status(message)
+        else:
+            self.status.value = message
+
     async def _toggle_strategy_execution(self) -> None:
         """Toggle between starting and stopping the strategy."""
         if not self.window_title_input.value:
@@ -3,29 +3,37 @@ import numpy as np
 from windows_capture import Frame, InternalCaptureControl, WindowsCapture
 
 import config
+from frame_preprocessor import CropTransform, FramePreprocessor
 
 
 WAIT_FRAME_TIMEOUT = 2
 
 
 class WindowCapture:
-    """A wrapper for WindowsCapture to capture a single frame from a specified window."""
+    """
+    A wrapper for WindowsCapture to capture a single frame from a specified window.
+    Frames are cropped to the game canvas and converted to grayscale in the capture thread.
+    """
 
-    def __init__(self, window_name: str) -> None:
-        """Initialize the WindowCapture for a specific window."""
+    def __init__(self, window_name: str, scale: float = 1.0) -> None:
+        """Initialize the WindowCapture for a specific window, optionally downsampling frames."""
         self._capture = WindowsCapture(cursor_capture=False, window_name=window_name)
         self._capture.frame_handler = self._on_frame_arrived
         self._capture.closed_handler = lambda: None
         self._running = False
         self._frame_ready_event = threading.Event()
-        self.latest_frame: np.ndarray | None = None
+        self._preprocessor = FramePreprocessor(scale)
+        # Latest frame with its crop transform, replaced as a whole by the capture thread
+        self._latest: tuple[np.ndarray, CropTransform] | None = None
+        # Transform of the frame last returned by get_frame
+        self._transform = CropTransform()
 
     def _on_frame_arrived(self, frame: Frame, capture_control: InternalCaptureControl) -> None:
         """
         Callback invoked when a new frame is received.
         Updates the latest frame and stops capture if not running.
         """
-        self.latest_frame = frame.frame_buffer
+        self._latest = self._preprocessor.process(frame.frame_buffer)
 
         if config.settings.capture_mode == config.CaptureMode.SINGLE:
             self._frame_ready_event.set()
@@ -43,14 +51,36 @@ class WindowCapture:
         """Stop capturing frames."""
         self._running = False
 
+    @property
+    def canvas_fallback(self) -> bool:
+        """Whether the game canvas was not detected and whole window frames are used."""
+        return self._preprocessor.fallback
+
+    @property
+    def transform(self) -> CropTransform:
+        """Transform of the frame last returned by get_frame."""
+        return self._transform
+
     def get_frame(self) -> (np.ndarray | None):
         """Retrieve the most recently captured frame."""
         if config.settings.capture_mode == config.CaptureMode.SINGLE:
             return self._capture_single_frame()
-        return self.latest_frame
+        return self._take_latest()
+
+    def to_client(self, position: tuple) -> tuple[int, int]:
+        """Map a position in the frame last returned by get_frame back to window client coordinates."""
+        return self._transform.to_client(position)
 
     def _capture_single_frame(self) -> (np.ndarray | None):
         self._capture.start_free_threaded()
         if self._frame_ready_event.wait(WAIT_FRAME_TIMEOUT):
-            return self.latest_frame
+            return self._take_latest()
         raise TimeoutError("No frame received within timeout")
+
+    def _take_latest(self) -> (np.ndarray | None):
+        """Return the latest frame and remember its transform for to_client."""
+        latest = self._latest
+        if latest is None:
+            return None
+        frame, self._transform = latest
+        return frame